@@ -0,0 +1,91 @@
+from functools import lru_cache
+
+from api.config import MAX_CHANGE
+
+
+# (denomination, quantity) pairs sorted by denomination. Hashable so it can key the cache
+Inventory = tuple[tuple[int, int], ...]
+
+_UNREACHABLE = float("inf")
+
+
+def inventory_key(coins, inserted: dict[int, int] | None = None, limit: int = MAX_CHANGE) -> Inventory:
+    """Cache key for the coins available to give change, including the ones the
+    customer just inserted. Quantities are capped at what `limit` could ever use,
+    so a tube that stays above its cap does not change the key between sales."""
+    inserted = inserted or {}
+    key = []
+    for coin in coins:
+        quantity = min(coin.quantity + inserted.get(coin.denomination, 0), limit // coin.denomination)
+        if quantity > 0:
+            key.append((coin.denomination, quantity))
+    return tuple(sorted(key))
+
+
+def _split(denomination: int, quantity: int, limit: int) -> list[tuple[int, int]]:
+    """Binary splitting of a coin tube into 0/1 items (value, number of coins),
+    so the table costs O(limit * log(quantity)) per denomination instead of
+    O(limit * quantity). Coins beyond what `limit` could ever use are ignored."""
+    quantity = min(quantity, limit // denomination)
+    items = []
+    size = 1
+    while quantity > 0:
+        take = min(size, quantity)
+        items.append((denomination * take, take))
+        quantity -= take
+        size *= 2
+    return items
+
+
+@lru_cache(maxsize=16)
+def change_table(inventory: Inventory, limit: int) -> tuple[list, list]:
+    """Minimum number of coins for every amount up to `limit` with the given
+    inventory. Works for non-canonical coin sets, where greedy is not optimal.
+
+    Returns the best counts and, per 0/1 item, the amounts where taking it
+    improved the result, which is enough to rebuild the coins for any amount.
+
+    The table only depends on the (capped) inventory. While every tube holds at
+    least MAX_CHANGE // denomination coins the key is stable and sales hit the
+    cache. Once a tube runs below that, each sale that moves it rebuilds the
+    table, O(limit * sum(log quantity)), a few milliseconds at MAX_CHANGE = 1000.
+    """
+    best = [0] + [_UNREACHABLE] * limit
+    items = []
+
+    for denomination, quantity in inventory:
+        for value, count in _split(denomination, quantity, limit):
+            taken = bytearray(limit + 1)
+            for amount in range(limit, value - 1, -1):
+                candidate = best[amount - value] + count
+                if candidate < best[amount]:
+                    best[amount] = candidate
+                    taken[amount] = 1
+            items.append((value, count, taken))
+
+    return best, items
+
+
+def make_change(inventory: Inventory, amount: int, limit: int = MAX_CHANGE) -> list[int] | None:
+    """Coins to dispense for `amount`, largest first, or None if it cannot be
+    given exactly with the coins available."""
+    if amount == 0:
+        return []
+    if amount < 0 or amount > limit:
+        return None
+
+    # the table only has to cover what the machine could possibly pay back
+    total = sum(denomination * quantity for denomination, quantity in inventory)
+    if amount > total:
+        return None
+
+    best, items = change_table(inventory, min(limit, total))
+    if best[amount] == _UNREACHABLE:
+        return None
+
+    coins = []
+    for value, count, taken in reversed(items):
+        if taken[amount]:
+            coins.extend([value // count] * count)
+            amount -= value
+    return sorted(coins, reverse=True)
@@ -1,5 +1,23 @@
+import os
+
 NUM_PRODUCTS_PER_SLOT = 3
-NUM_SLOTS_PER_ROW = 4
-NUM_ROWS = 1
+NUM_SLOTS_PER_ROW = int(os.getenv("NUM_SLOTS_PER_ROW", "4"))
+NUM_ROWS = int(os.getenv("NUM_ROWS", "1"))
+
+MAX_PRODUCT_NAME_LENGTH = 20
+
+# largest change (in cents) the machine will compute; bounds the per-sale work
+MAX_CHANGE = 1000
+
+# events between inventory snapshots of a slot; bounds the tail replayed per stock query
+INVENTORY_SNAPSHOT_INTERVAL = 20
+
+
+# ========== PROFILING ============
+# disabled by default; when off the middleware and SQL hooks are not installed
 
-MAX_PRODUCT_NAME_LENGTH = 20
\ No newline at end of file
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")              # requests with header X-Profile: <token> are profiled
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # fraction of requests profiled at random
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))    # seconds between stack samples
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
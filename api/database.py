@@ -1,18 +1,68 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite:///./machine.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./machine.db")
+
+# read replica; when not provided, reads go to a read-only connection to the primary
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", DATABASE_URL)
 
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False}
 )
 
+
+_READ_ONLY_STATEMENTS = {
+    "sqlite": "PRAGMA query_only = ON",
+    "postgresql": "SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY",
+    "mysql": "SET SESSION TRANSACTION READ ONLY",
+    "mariadb": "SET SESSION TRANSACTION READ ONLY",
+}
+
+
+def create_read_engine(url: str):
+    """Engine for read traffic. Every connection is made read-only, so a read
+    session can never write, even when it points at the primary: query_only on
+    SQLite, a read-only default transaction on PostgreSQL and MySQL/MariaDB.
+    Other dialects are not restricted; point READ_DATABASE_URL at a replica or a
+    read-only user there."""
+    read_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {}
+    )
+
+    @event.listens_for(read_engine, "connect")
+    def _set_read_only(dbapi_connection, connection_record):
+        statement = _READ_ONLY_STATEMENTS.get(read_engine.dialect.name)
+        if statement is None:
+            return
+        cursor = dbapi_connection.cursor()
+        cursor.execute(statement)
+        cursor.close()
+
+    return read_engine
+
+
+read_engine = create_read_engine(READ_DATABASE_URL)
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False)
 
 def get_db():
+    """Session bound to the primary. Used by every route that writes, so reads
+    made inside the same request see its own changes."""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    """Session bound to the read-only engine. Used by GET routes."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
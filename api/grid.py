@@ -0,0 +1,44 @@
+import string
+
+from api.config import NUM_ROWS, NUM_SLOTS_PER_ROW
+
+
+def row_label(index: int) -> str:
+    """Row letters like spreadsheet columns: A..Z, AA, AB..."""
+    label = ""
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        label = string.ascii_uppercase[remainder] + label
+    return label
+
+
+class SlotGrid:
+    """The valid slot codes of the cabinet, precomputed from its size.
+
+    Codes are the row letters followed by the 1-based column, i.e. 'A1' or 'J12',
+    and are kept in row-major order.
+    """
+
+    def __init__(self, rows: int, columns: int):
+        self.rows = rows
+        self.columns = columns
+
+        self._codes: list[str] = [
+            f"{row_label(row)}{column}" for row in range(rows) for column in range(1, columns + 1)
+        ]
+        self._valid: frozenset[str] = frozenset(self._codes)
+
+        self.max_code_length = max((len(code) for code in self._codes), default=0)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._valid
+
+    def __iter__(self):
+        return iter(self._codes)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+
+GRID = SlotGrid(NUM_ROWS, NUM_SLOTS_PER_ROW)
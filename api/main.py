@@ -5,13 +5,17 @@ import uvicorn
 from sqlalchemy.orm import Session
 
 from datetime import datetime
+from collections import Counter
 
-from api.database import engine, get_db
+from api.change import inventory_key, make_change
+from api.config import PROFILE_ENABLED
+from api.database import engine, read_engine, get_db, get_read_db
 from api.models import DecBase
 import api.models as models
 import api.schemas as schemas
+from api.routers.coins import router as coins_router, list_coins
 from api.routers.products import router as products_router, list_products
-from api.routers.slots import router as slots_router, get_slot_by_code, list_slots
+from api.routers.slots import router as slots_router, get_slot_by_code, list_slots, record_inventory_event
 from api.routers.transactions import router as transactions_router, list_transactions
 
 
@@ -19,6 +23,11 @@ app = FastAPI()
 app.include_router(products_router)
 app.include_router(slots_router)
 app.include_router(transactions_router)
+app.include_router(coins_router)
+
+if PROFILE_ENABLED:
+    from api.profiling import install_profiler
+    install_profiler(app, engine, read_engine)
 
 DecBase.metadata.create_all(bind=engine)
 
@@ -29,7 +38,7 @@ def index():
 
 
 @app.get("/info", response_model=schemas.MachineResponse)
-def get_info(db: Session = Depends(get_db)):
+def get_info(db: Session = Depends(get_read_db)):
     products = list_products(db)
     slots = list_slots(db)
     transactions = list_transactions(db)
@@ -40,7 +49,7 @@ def get_info(db: Session = Depends(get_db)):
     )
 
 
-@app.post("/buy")
+@app.post("/buy", response_model=schemas.PurchaseResponse)
 def buy(data: schemas.PaymentRequest, db: Session = Depends(get_db)):
     slot_code = data.slot
     amount = data.amount
@@ -59,6 +68,29 @@ def buy(data: schemas.PaymentRequest, db: Session = Depends(get_db)):
     if amount < slot.product.price:
         raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail=f"Product price is {slot.product.price} and you gave {amount}. Insufficient")
     
+    # work out the change with the coins in the machine plus the ones inserted
+    price = slot.product.price
+    coins: list[models.Coin] = list_coins(db)
+    inserted = Counter(data.coins or [])
+
+    not_accepted = set(inserted) - {coin.denomination for coin in coins}
+    if not_accepted:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=f"Coins not accepted: {sorted(not_accepted)}")
+
+    # change is only paid out of money the machine has counted into its tubes
+    if data.coins is None and amount > price:
+        change = None
+    else:
+        change = make_change(inventory_key(coins, inserted), amount - price)
+
+    if change is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Exact change only")
+
+    # credit inserted coins and dispense change
+    dispensed = Counter(change)
+    for coin in coins:
+        coin.quantity += inserted[coin.denomination] - dispensed[coin.denomination]
+
     # remove product from slot
     slot.quantity -= 1
 
@@ -67,14 +99,18 @@ def buy(data: schemas.PaymentRequest, db: Session = Depends(get_db)):
         product_id = slot.product_id,
         slot_id=slot.id,
         date=datetime.today(),
-        amount=amount
+        amount=price
     ).model_dump())
+    record_inventory_event(db, slot, models.EVENT_SALE, -1, transaction)
 
     # apply changes to database
     db.add(transaction); db.commit()
     db.refresh(slot); db.refresh(transaction)
 
-    return transaction
+    return schemas.PurchaseResponse(
+        transaction=schemas.TransactionResponse.model_validate(transaction, from_attributes=True),
+        change=change
+    )
 
 
 if __name__ == "__main__":
@@ -1,7 +1,8 @@
 from sqlalchemy.orm import DeclarativeBase, relationship
-from sqlalchemy import Integer, String, Text, Column, ForeignKey, Boolean, DateTime
+from sqlalchemy import Integer, String, Text, Column, ForeignKey, Boolean, DateTime, Index
 
 from api.config import MAX_PRODUCT_NAME_LENGTH
+from api.grid import GRID
 
 
 class DecBase(DeclarativeBase):
@@ -23,13 +24,16 @@ class Slot(DecBase):
     __tablename__ = "slots"
 
     id = Column(Integer, primary_key=True, index=True)
-    code = Column(String(2), unique=True, nullable=False)
+    code = Column(String(GRID.max_code_length), unique=True, nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"))
     quantity = Column(Integer, default=0)
     capacity = Column(Integer, nullable=False)
 
     product = relationship("Product", back_populates="slots")
 
+    # never reuse the id of a deleted slot, its ledger keeps pointing at it
+    __table_args__ = {"sqlite_autoincrement": True}
+
 
 class Transaction(DecBase):
     __tablename__ = "transaction"
@@ -41,4 +45,52 @@ class Transaction(DecBase):
     date = Column(DateTime)
 
     product = relationship("Product", back_populates="transactions")
-    slot = relationship("Slot")
\ No newline at end of file
+    slot = relationship("Slot")
+
+
+class Coin(DecBase):
+    __tablename__ = "coins"
+
+    id = Column(Integer, primary_key=True, index=True)
+    denomination = Column(Integer, unique=True, nullable=False)
+    quantity = Column(Integer, default=0, nullable=False)
+
+
+# inventory event kinds
+EVENT_OPENING = "opening"
+EVENT_SALE = "sale"
+EVENT_RESTOCK = "restock"
+EVENT_ADJUSTMENT = "adjustment"
+
+
+class InventoryEvent(DecBase):
+    """Append-only record of every change to a slot's quantity.
+
+    slot_id has no foreign key on purpose: the ledger outlives deleted slots."""
+    __tablename__ = "inventory_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    slot_id = Column(Integer, nullable=False)
+    kind = Column(String(10), nullable=False)
+    delta = Column(Integer, nullable=False)
+    date = Column(DateTime, nullable=False)
+    transaction_id = Column(Integer, ForeignKey("transaction.id"))
+
+    transaction = relationship("Transaction")
+
+    __table_args__ = (Index("ix_inventory_events_slot_id_id", "slot_id", "id"),)
+
+
+class InventorySnapshot(DecBase):
+    """Quantity of a slot right after event `event_id`, taken every few events."""
+    __tablename__ = "inventory_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    slot_id = Column(Integer, nullable=False)
+    event_id = Column(Integer, ForeignKey("inventory_events.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    date = Column(DateTime, nullable=False)
+
+    event = relationship("InventoryEvent")
+
+    __table_args__ = (Index("ix_inventory_snapshots_slot_id_event_id", "slot_id", "event_id"),)
\ No newline at end of file
@@ -0,0 +1,164 @@
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from api.config import PROFILE_DIR, PROFILE_INTERVAL, PROFILE_SAMPLE_RATE, PROFILE_TOKEN
+
+
+PROFILE_HEADER = "x-profile"
+
+_API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# SQL statements of the request being profiled, if any (propagates into the threadpool)
+_current_queries: ContextVar[list | None] = ContextVar("_current_queries", default=None)
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of every thread running code from the api package.
+
+    Sync handlers run in the threadpool, so the sampler cannot only look at the
+    current thread. Concurrent requests running at the same time may show up in
+    the same profile.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                stack = _collapse(frame)
+                if stack:
+                    self.samples[stack] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _collapse(frame) -> str | None:
+    names = []
+    in_api = False
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.startswith(_API_DIR) and not code.co_filename.endswith("profiling.py"):
+            in_api = True
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    if not in_api:
+        return None
+    return ";".join(reversed(names))
+
+
+# ========== SQL CAPTURE ============
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_queries.get() is not None:
+        conn.info.setdefault("_profile_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current_queries.get()
+    starts = conn.info.get("_profile_start")
+    if queries is None or not starts:
+        return
+    start = starts.pop()
+    queries.append({"statement": statement, "ms": round((time.perf_counter() - start) * 1000, 3)})
+
+
+def install_sql_hooks(*engines: Engine):
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def remove_sql_hooks(*engines: Engine):
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ========== MIDDLEWARE ============
+
+def should_profile(request: Request) -> bool:
+    header = request.headers.get(PROFILE_HEADER)
+    if PROFILE_TOKEN and header and hmac.compare_digest(header.encode(), PROFILE_TOKEN.encode()):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def write_profile(request: Request, status_code: int, elapsed: float, sampler: StackSampler, queries: list) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = "{}-{}-{}".format(
+        datetime.now().strftime("%Y%m%dT%H%M%S%f"),
+        request.method,
+        request.url.path.strip("/").replace("/", "_") or "root"
+    )
+    base = os.path.join(PROFILE_DIR, name)
+
+    # collapsed stacks, loadable by speedscope and flamegraph.pl
+    with open(base + ".collapsed", "w") as f:
+        for stack, count in sampler.samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+    self_samples: Counter[str] = Counter()
+    for stack, count in sampler.samples.items():
+        self_samples[stack.rsplit(";", 1)[-1]] += count
+
+    summary = {
+        "method": request.method,
+        "path": request.url.path,
+        "status_code": status_code,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "samples": sum(sampler.samples.values()),
+        "sample_interval_ms": sampler.interval * 1000,
+        "top_frames": [{"frame": frame, "samples": count} for frame, count in self_samples.most_common(20)],
+        "sql_count": len(queries),
+        "sql_ms": round(sum(q["ms"] for q in queries), 3),
+        "sql": queries,
+    }
+    with open(base + ".json", "w") as f:
+        json.dump(summary, f, indent=2)
+
+    return base
+
+
+def install_profiler(app: FastAPI, *engines: Engine):
+    install_sql_hooks(*engines)
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        if not should_profile(request):
+            return await call_next(request)
+
+        queries = []
+        token = _current_queries.set(queries)
+        sampler = StackSampler(PROFILE_INTERVAL)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            elapsed = time.perf_counter() - start
+            sampler.stop()
+            _current_queries.reset(token)
+
+        base = write_profile(request, response.status_code, elapsed, sampler, queries)
+        response.headers["X-Profile-File"] = os.path.basename(base)
+        return response
@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.exceptions import HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from api.database import get_db, get_read_db
+from api.schemas import CoinCreate, CoinUpdate, CoinResponse
+from api.models import Coin
+
+
+# ========== CRUD FUNCTIONS ============
+
+def list_coins(db: Session) -> list[Coin]:
+    coins: list[Coin] = db.execute(select(Coin).order_by(Coin.denomination)).scalars().all()
+    return coins
+
+
+def get_coin_by_id(db: Session, coin_id: int) -> Coin:
+    coin: Coin = db.query(Coin).filter(Coin.id == coin_id).first()
+    return coin
+
+
+def update_coin_by_id(db: Session, coin_id: int, data: CoinUpdate) -> Coin:
+    coin: Coin = get_coin_by_id(db, coin_id)
+    if not coin:
+        return
+
+    data = data.model_dump(exclude_unset=True)
+    for key, value in data.items():
+        setattr(coin, key, value)
+
+    return coin
+
+# =======================================
+
+
+class CoinNotFoundException(HTTPException):
+    def __init__(self, coin_id: int):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Coin with ID {coin_id} not found")
+
+
+router = APIRouter(prefix="/coins")
+
+
+@router.get("/", response_model=list[CoinResponse])
+def get_coins(db: Session = Depends(get_read_db)):
+    coins: list[Coin] = list_coins(db)
+    return coins
+
+
+@router.post("/", response_model=CoinResponse)
+def add_coin(data: CoinCreate, db: Session = Depends(get_db)):
+    coin: Coin = Coin(**data.model_dump())
+    db.add(coin)
+    try:
+        db.commit(); db.refresh(coin)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Coin with denomination {coin.denomination} already exists")
+    return coin
+
+
+@router.get("/{coin_id}", response_model=CoinResponse)
+def get_coin(coin_id: int, db: Session = Depends(get_read_db)):
+    coin: Coin = get_coin_by_id(db, coin_id)
+
+    if not coin:
+        raise CoinNotFoundException(coin_id)
+
+    return coin
+
+
+@router.patch("/{coin_id}", response_model=CoinResponse)
+def update_coin(coin_id: int, data: CoinUpdate, db: Session = Depends(get_db)):
+    coin: Coin = update_coin_by_id(db, coin_id, data)
+
+    if not coin:
+        raise CoinNotFoundException(coin_id)
+
+    db.commit(); db.refresh(coin)
+
+    return coin
+
+
+@router.delete("/{coin_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_coin(coin_id: int, db: Session = Depends(get_db)):
+    coin: Coin = get_coin_by_id(db, coin_id)
+    if not coin:
+        raise CoinNotFoundException(coin_id)
+    db.delete(coin); db.commit()
+    return
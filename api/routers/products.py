@@ -4,7 +4,7 @@ from fastapi.exceptions import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from api.database import get_db
+from api.database import get_db, get_read_db
 from api.schemas import ProductCreate, ProductResponse, ProductUpdate
 from api.models import Product
 
@@ -46,7 +46,7 @@ router = APIRouter(prefix="/products")
 
 
 @router.get("/", response_model=list[ProductResponse])
-def get_products(db = Depends(get_db)):
+def get_products(db = Depends(get_read_db)):
     products: list[Product] = list_products(db)
     return products
 
@@ -59,7 +59,7 @@ def add_product(data: ProductCreate, db = Depends(get_db)):
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(product_id: int, db: Session = Depends(get_read_db)):
     product: Product = get_product_by_id(db, product_id)
     if not product:
         raise ProductNotFoundException(product_id)
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, status
 from fastapi.exceptions import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, func
 from sqlalchemy.exc import IntegrityError
 
-from api.database import get_db
-from api.schemas import SlotCreate, SlotUpdate, SlotResponse
-from api.models import Slot
+from datetime import datetime
+
+from api.database import get_db, get_read_db
+from api.grid import GRID
+from api.config import INVENTORY_SNAPSHOT_INTERVAL
+from api.schemas import SlotCreate, SlotUpdate, SlotResponse, SlotHistoryResponse
+from api.models import Slot, Transaction, InventoryEvent, InventorySnapshot, EVENT_OPENING, EVENT_RESTOCK, EVENT_ADJUSTMENT
 
 
 # ========== CRUD FUNCTIONS ============
@@ -16,8 +20,27 @@ def list_slots(db: Session) -> list[Slot]:
     return slots
 
 
+# code -> slot id, filled from the database as codes are looked up and kept up to
+# date by create_slot/delete_slot. Entries are checked on every use, so a stale
+# one (another process, a rolled back transaction) only costs a lookup by code.
+_slot_ids: dict[str, int] = {}
+
+
 def get_slot_by_code(db: Session, code: str) -> Slot:
+    # codes outside the grid cannot exist, no need to ask the database
+    if code not in GRID:
+        return None
+
+    slot_id = _slot_ids.get(code)
+    if slot_id is not None:
+        slot: Slot = db.get(Slot, slot_id)
+        if slot and slot.code == code:
+            return slot
+        _slot_ids.pop(code, None)
+
     slot: Slot = db.query(Slot).filter(Slot.code==code).first()
+    if slot:
+        _slot_ids[code] = slot.id
     return slot
 
 
@@ -26,6 +49,63 @@ def get_slot_by_id(db: Session, slot_id: int) -> Slot:
     return slot
 
 
+def record_inventory_event(db: Session, slot: Slot, kind: str, delta: int, transaction: Transaction | None = None) -> InventoryEvent:
+    """Append an event for a change already applied to `slot.quantity`, and a
+    snapshot of the new quantity every INVENTORY_SNAPSHOT_INTERVAL events.
+
+    A slot stocked before it had any ledger rows (older databases, or rows
+    written straight through the ORM) first gets an opening event with the
+    quantity it held before this change."""
+    last_snapshot = select(func.coalesce(func.max(InventorySnapshot.event_id), 0)) \
+        .where(InventorySnapshot.slot_id == slot.id).scalar_subquery()
+    events_since_snapshot = select(func.count(InventoryEvent.id)) \
+        .where(InventoryEvent.slot_id == slot.id, InventoryEvent.id > last_snapshot).scalar_subquery()
+    last_snapshot_id, pending = db.execute(select(last_snapshot, events_since_snapshot)).one()
+
+    opening_quantity = slot.quantity - delta
+    if not last_snapshot_id and not pending and opening_quantity:
+        db.add(InventoryEvent(slot_id=slot.id, kind=EVENT_OPENING, delta=opening_quantity, date=datetime.today()))
+        pending += 1
+
+    event = InventoryEvent(slot_id=slot.id, kind=kind, delta=delta, date=datetime.today(), transaction=transaction)
+    db.add(event)
+
+    # the new events are not flushed yet, so they are not in the query
+    if pending + 1 >= INVENTORY_SNAPSHOT_INTERVAL:
+        db.add(InventorySnapshot(slot_id=slot.id, event=event, quantity=slot.quantity, date=event.date))
+
+    return event
+
+
+def get_slot_stock(db: Session, slot_id: int, at: datetime | None = None, current_quantity: int | None = None) -> tuple[int | None, InventorySnapshot | None, list[InventoryEvent]]:
+    """Quantity of a slot now or at `at`, from its latest snapshot plus the events after it.
+
+    Works for deleted slots too, their ledger is kept. For a slot without any
+    ledger rows `current_quantity` is returned (None when the slot does not exist)."""
+    snapshot_query = select(InventorySnapshot).where(InventorySnapshot.slot_id == slot_id)
+    if at:
+        snapshot_query = snapshot_query.where(InventorySnapshot.date <= at)
+    snapshot: InventorySnapshot = db.execute(
+        snapshot_query.order_by(InventorySnapshot.event_id.desc()).limit(1)
+    ).scalars().first()
+
+    events_query = select(InventoryEvent).where(
+        InventoryEvent.slot_id == slot_id,
+        InventoryEvent.id > (snapshot.event_id if snapshot else 0)
+    )
+    if at:
+        events_query = events_query.where(InventoryEvent.date <= at)
+    events: list[InventoryEvent] = db.execute(events_query.order_by(InventoryEvent.id)).scalars().all()
+
+    if not snapshot and not events:
+        # no ledger yet: the slot row is all we know, it gets an opening event on its next change
+        has_ledger = db.execute(select(InventoryEvent.id).where(InventoryEvent.slot_id == slot_id).limit(1)).first()
+        if not has_ledger:
+            return current_quantity, None, []
+
+    quantity = (snapshot.quantity if snapshot else 0) + sum(event.delta for event in events)
+    return quantity, snapshot, events
+
 
 # =======================================
 
@@ -40,7 +120,7 @@ router = APIRouter(prefix="/slots")
 
 
 @router.get("/", response_model=list[SlotResponse])
-def get_slots(db = Depends(get_db)):
+def get_slots(db = Depends(get_read_db)):
     slots: list[Slot] = list_slots(db)
     return slots
 
@@ -50,7 +130,11 @@ def create_slot(data: SlotCreate, db: Session = Depends(get_db)) -> Slot:
     slot: Slot = Slot(**data.model_dump())
     db.add(slot); 
     try:
+        db.flush()
+        if slot.quantity:
+            record_inventory_event(db, slot, EVENT_RESTOCK, slot.quantity)
         db.commit(); db.refresh(slot);
+        _slot_ids[slot.code] = slot.id
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Slot with code {slot.code} already exists")
@@ -58,7 +142,7 @@ def create_slot(data: SlotCreate, db: Session = Depends(get_db)) -> Slot:
 
 
 @router.get("/{slot_id}", response_model=SlotResponse)
-def get_slots(slot_id: int, db = Depends(get_db)):
+def get_slots(slot_id: int, db = Depends(get_read_db)):
     slot = get_slot_by_id(db, slot_id)
 
     if not slot:
@@ -80,8 +164,10 @@ def update_slot(slot_id: int, data: SlotUpdate, db = Depends(get_db)) -> Slot:
     if data.product_id:
         slot.product_id = data.product_id
     
-    if data.quantity:
+    if data.quantity and data.quantity != slot.quantity:
+        delta = data.quantity - slot.quantity
         slot.quantity = data.quantity
+        record_inventory_event(db, slot, EVENT_RESTOCK if delta > 0 else EVENT_ADJUSTMENT, delta)
 
     db.commit(); db.refresh(slot)
 
@@ -93,6 +179,22 @@ def delete_slot(slot_id: int, db: Session = Depends(get_db)):
     slot: Slot = get_slot_by_id(db, slot_id)
     if not slot:
         raise SlotNotFoundException(slot_id)
+    # close the slot in the ledger; its history is kept
+    if slot.quantity:
+        removed = slot.quantity
+        slot.quantity = 0
+        record_inventory_event(db, slot, EVENT_ADJUSTMENT, -removed)
     db.delete(slot); db.commit();
+    _slot_ids.pop(slot.code, None)
     return
 
+
+@router.get("/{slot_id}/history", response_model=SlotHistoryResponse)
+def get_slot_history(slot_id: int, at: datetime | None = None, db: Session = Depends(get_read_db)):
+    slot = get_slot_by_id(db, slot_id)
+    quantity, snapshot, events = get_slot_stock(db, slot_id, at, slot.quantity if slot else None)
+
+    if quantity is None:
+        raise SlotNotFoundException(slot_id=slot_id)
+
+    return SlotHistoryResponse(slot_id=slot_id, quantity=quantity, at=at, snapshot=snapshot, events=events)
@@ -4,7 +4,7 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
-from api.database import get_db
+from api.database import get_read_db
 from api.schemas import TransactionResponse
 from api.models import Transaction
 
@@ -33,13 +33,13 @@ router = APIRouter(prefix="/transactions")
 
 
 @router.get("/", response_model=list[TransactionResponse])
-def get_transactions(db: Session = Depends(get_db)):
+def get_transactions(db: Session = Depends(get_read_db)):
     transactions: list[Transaction] = list_transactions(db)
     return transactions
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
-def get_transaction(transaction_id: int, db: Session = Depends(get_db)):
+def get_transaction(transaction_id: int, db: Session = Depends(get_read_db)):
     transaction: Transaction = get_transaction_by_id(db, transaction_id)
     
     if not transaction:
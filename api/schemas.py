@@ -1,9 +1,9 @@
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 from typing import Optional
 from datetime import datetime
-import string
 
-from api.config import NUM_PRODUCTS_PER_SLOT, NUM_SLOTS_PER_ROW, NUM_ROWS
+from api.config import NUM_PRODUCTS_PER_SLOT
+from api.grid import GRID, row_label
 
 
 # =========== PRODUCT ============
@@ -34,15 +34,13 @@ class SlotBase(BaseModel):
     quantity: Optional[int] = Field(0, ge=0, le=NUM_PRODUCTS_PER_SLOT)
 
 class SlotCreate(SlotBase):
-    code: str = Field(..., min_length=2, max_length=2)
+    code: str = Field(..., min_length=2)
     capacity: int = Field(..., gt=0, le=NUM_PRODUCTS_PER_SLOT)
 
     @field_validator("code")
     def validate_code(value: str):
-        if value[0] not in string.ascii_uppercase[:NUM_ROWS]:
-            raise ValueError(f"Code must start with an uppercase letter and between A and {string.ascii_uppercase[NUM_ROWS-1]} i.e. 'A2'")
-        if value[1] not in string.digits[1:NUM_SLOTS_PER_ROW+1]:
-            raise ValueError(f"Code must end with a digit between 1 and {NUM_SLOTS_PER_ROW} i.e. 'B9'")
+        if value not in GRID:
+            raise ValueError(f"Code must be a row between A and {row_label(GRID.rows-1)} followed by a column between 1 and {GRID.columns} i.e. 'A2'")
         return value
 
 
@@ -57,6 +55,35 @@ class SlotResponse(SlotBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# =========== INVENTORY ============
+
+class InventoryEventResponse(BaseModel):
+    id: int
+    slot_id: int
+    kind: str
+    delta: int
+    date: datetime
+    transaction_id: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class InventorySnapshotResponse(BaseModel):
+    id: int
+    slot_id: int
+    event_id: int
+    quantity: int
+    date: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SlotHistoryResponse(BaseModel):
+    slot_id: int
+    quantity: int
+    at: Optional[datetime] = None
+    snapshot: Optional[InventorySnapshotResponse] = None
+    events: list[InventoryEventResponse]
+
+
 # =========== TRANSACTION ============
 
 class TransactionBase(BaseModel):
@@ -74,11 +101,54 @@ class TransactionResponse(TransactionBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# =========== COIN ============
+
+class CoinBase(BaseModel):
+    quantity: Optional[int] = Field(0, ge=0)
+
+class CoinCreate(CoinBase):
+    denomination: int = Field(..., gt=0)
+
+class CoinUpdate(CoinBase):
+    quantity: Optional[int] = Field(None, ge=0)
+
+    @field_validator("quantity")
+    def validate_quantity(value: Optional[int]):
+        if value is None:
+            raise ValueError("Quantity cannot be null")
+        return value
+
+class CoinResponse(CoinBase):
+    id: int
+    denomination: int
+    quantity: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # =========== PAYMENT ============
 
 class PaymentRequest(BaseModel):
-    slot: str = Field(..., min_length=2, max_length=2)
+    slot: str = Field(..., min_length=2)
     amount: int = Field(..., gt=0)
+    coins: Optional[list[int]] = Field(None, min_length=1)  # denominations inserted, credited to the tubes
+
+    # checked against the current grid rather than with Field(max_length=...), fixed at import
+    @field_validator("slot")
+    def validate_slot(value: str):
+        if len(value) > GRID.max_code_length:
+            raise ValueError(f"Slot code must have at most {GRID.max_code_length} characters")
+        return value
+
+    @model_validator(mode="after")
+    def validate_coins(self):
+        if self.coins is not None and sum(self.coins) != self.amount:
+            raise ValueError(f"Inserted coins add up to {sum(self.coins)}, not to amount {self.amount}")
+        return self
+
+class PurchaseResponse(BaseModel):
+    transaction: TransactionResponse
+    change: list[int]
 
 
 # =========== PAYMENT ============
@@ -1,26 +1,60 @@
+import os
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from api.main import app, get_db
+# keep the app's own engines off ./machine.db; importing api.main runs create_all
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from api.main import app, get_db, get_read_db
 from api.models import DecBase
 
 
-@pytest.fixture(name="session")
-def session_fixture():
+# Each pytest(-xdist) worker is its own process with its own in-memory database,
+# so the schema is built once per worker and tests never share data across workers.
+
+@pytest.fixture(name="engine", scope="session")
+def engine_fixture():
     engine = create_engine(
         "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
     )
-    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    # let SQLAlchemy emit BEGIN/SAVEPOINT itself instead of pysqlite, so nested
+    # transactions work (https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl)
+    @event.listens_for(engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+    @event.listens_for(engine, "begin")
+    def do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     DecBase.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="session")
+def session_fixture(engine):
+    # every commit inside the test only releases a SAVEPOINT; the outer
+    # transaction is rolled back at the end so the next test starts clean
+    connection = engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal = sessionmaker(
+        bind=connection, autoflush=False, autocommit=False, join_transaction_mode="create_savepoint"
+    )
 
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture(name="client")
@@ -28,7 +62,30 @@ def client_fixture(session):
     def get_db_override():
         yield session
 
-    app.dependency_overrides[get_db] = get_db_override
+    overrides = {get_db: get_db_override, get_read_db: get_db_override}
+    previous = {dependency: app.dependency_overrides.get(dependency) for dependency in overrides}
+
+    app.dependency_overrides.update(overrides)
     client = TestClient(app)
     yield client
-    app.dependency_overrides.clear()
\ No newline at end of file
+
+    # only undo our own overrides
+    for dependency, override in previous.items():
+        if override is None:
+            app.dependency_overrides.pop(dependency, None)
+        else:
+            app.dependency_overrides[dependency] = override
+
+
+@pytest.fixture(name="queries")
+def queries_fixture(engine):
+    """SQL statements run during the test, without the transaction bookkeeping."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,127 @@
+from sqlalchemy.orm import Session
+from fastapi.testclient import TestClient
+
+import api.routers.slots as slots
+from api.models import Slot
+from .test_products import _add_product_to_db
+from .test_slots import _add_slot_to_db
+from .test_coins import _add_coin_to_db
+
+
+def test_buy_returns_change(session: Session, client: TestClient):
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    slot = _add_slot_to_db(session, "A1", 3, 2, product.id)
+    coin_10 = _add_coin_to_db(session, 10, 5)
+    coin_50 = _add_coin_to_db(session, 50, 1)
+    coin_100 = _add_coin_to_db(session, 100, 0)
+
+    response = client.post("/buy", json={"slot": "A1", "amount": 350, "coins": [100, 100, 100, 50]})
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["change"] == [50, 10]
+    assert data["transaction"]["amount"] == 290
+
+    # the inserted coins go into the tubes, the change comes out of them
+    session.refresh(coin_10); session.refresh(coin_50); session.refresh(coin_100)
+    assert coin_10.quantity == 4
+    assert coin_50.quantity == 1
+    assert coin_100.quantity == 3
+    assert session.get(Slot, slot.id).quantity == 1
+
+
+def test_buy_exact_change_only(session: Session, client: TestClient):
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    slot = _add_slot_to_db(session, "A1", 3, 2, product.id)
+    _add_coin_to_db(session, 50, 1)
+    _add_coin_to_db(session, 100, 0)
+
+    response = client.post("/buy", json={"slot": "A1", "amount": 300, "coins": [100, 100, 100]})
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Exact change only"
+    assert session.get(Slot, slot.id).quantity == 2
+
+    response = client.post("/buy", json={"slot": "A1", "amount": 290})
+
+    assert response.status_code == 200
+    assert response.json()["change"] == []
+
+
+def test_buy_resolves_slot_by_code(session: Session, client: TestClient, monkeypatch):
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    # ids that do not follow the grid order, as in a database filled by autoincrement
+    session.add(Slot(id=1, code="A2", capacity=3, quantity=2, product_id=product.id))
+    session.commit()
+
+    # a stale entry in the code -> id map must not sell from another slot
+    monkeypatch.setattr(slots, "_slot_ids", {"A1": 1})
+
+    response = client.post("/buy", json={"slot": "A1", "amount": 290})
+    assert response.status_code == 404
+
+    response = client.post("/buy", json={"slot": "A2", "amount": 290})
+    assert response.status_code == 200
+    assert response.json()["transaction"]["slot_id"] == 1
+
+
+def test_buy_credits_inserted_coins(session: Session, client: TestClient):
+
+    product = _add_product_to_db(session, "Twix", 80)
+    _add_slot_to_db(session, "A1", 3, 3, product.id)
+    coin_20 = _add_coin_to_db(session, 20, 0)
+    coin_100 = _add_coin_to_db(session, 100, 0)
+
+    # empty machine, change cannot be given yet
+    response = client.post("/buy", json={"slot": "A1", "amount": 100, "coins": [100]})
+    assert response.status_code == 409
+
+    response = client.post("/buy", json={"slot": "A1", "amount": 80, "coins": [20, 20, 20, 20]})
+    assert response.status_code == 200
+    assert response.json()["change"] == []
+
+    # change comes from the coins the previous customer inserted
+    response = client.post("/buy", json={"slot": "A1", "amount": 100, "coins": [100]})
+    assert response.status_code == 200
+    assert response.json()["change"] == [20]
+
+    session.refresh(coin_20); session.refresh(coin_100)
+    assert coin_20.quantity == 3
+    assert coin_100.quantity == 1
+
+
+def test_buy_without_coins_gives_no_change(session: Session, client: TestClient):
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    slot = _add_slot_to_db(session, "A1", 3, 2, product.id)
+    coin_10 = _add_coin_to_db(session, 10, 5)
+
+    # the payment was never counted into the tubes, so nothing is paid out of them
+    response = client.post("/buy", json={"slot": "A1", "amount": 300})
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Exact change only"
+    session.refresh(coin_10)
+    assert coin_10.quantity == 5
+
+    response = client.post("/buy", json={"slot": "A1", "amount": 290})
+
+    assert response.status_code == 200
+    assert session.get(Slot, slot.id).quantity == 1
+
+
+def test_buy_with_invalid_coins(session: Session, client: TestClient):
+
+    product = _add_product_to_db(session, "Twix", 80)
+    _add_slot_to_db(session, "A1", 3, 3, product.id)
+    _add_coin_to_db(session, 20, 5)
+
+    response = client.post("/buy", json={"slot": "A1", "amount": 100, "coins": [20, 20]})
+    assert response.status_code == 422
+
+    response = client.post("/buy", json={"slot": "A1", "amount": 80, "coins": [20, 20, 40]})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Coins not accepted: [40]"
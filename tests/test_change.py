@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from api.change import inventory_key, make_change
+
+
+def test_exact_amount_needs_no_change():
+
+    assert make_change(((10, 5),), 0) == []
+
+
+def test_non_canonical_coins_use_fewest_coins():
+
+    # greedy would give 4 + 1 + 1
+    assert make_change(((1, 5), (3, 5), (4, 5)), 6) == [3, 3]
+
+
+def test_change_respects_coin_quantities():
+
+    assert make_change(((10, 3), (20, 2), (50, 1)), 80) == [50, 20, 10]
+    assert make_change(((10, 1), (50, 1)), 80) is None
+
+
+def test_change_impossible_with_available_coins():
+
+    assert make_change(((3, 1), (4, 5)), 6) is None
+    assert make_change((), 10) is None
+
+
+def test_change_above_limit_is_refused():
+
+    assert make_change(((1, 100),), 50, limit=20) is None
+
+
+def test_inventory_key_is_stable_for_full_tubes():
+
+    coins = [SimpleNamespace(denomination=10, quantity=500), SimpleNamespace(denomination=50, quantity=3)]
+    before = inventory_key(coins, limit=1000)
+
+    # a sale that takes from a tube above its cap does not change the key
+    coins[0].quantity -= 2
+    assert inventory_key(coins, limit=1000) == before == ((10, 100), (50, 3))
+
+    coins[1].quantity -= 1
+    assert inventory_key(coins, limit=1000) == ((10, 100), (50, 2))
+
+
+def test_inventory_key_includes_inserted_coins():
+
+    coins = [SimpleNamespace(denomination=10, quantity=0), SimpleNamespace(denomination=50, quantity=1)]
+
+    assert inventory_key(coins, {10: 2, 50: 1}) == ((10, 2), (50, 2))
@@ -0,0 +1,111 @@
+from sqlalchemy.orm import Session
+from fastapi.testclient import TestClient
+
+from api.models import Coin
+
+
+def _add_coin_to_db(session, denomination: int, quantity: int):
+    coin = Coin(denomination=denomination, quantity=quantity)
+    session.add(coin)
+    session.commit()
+    return coin
+
+
+def test_create_valid_coin(client: TestClient):
+
+    response = client.post("/coins", json={"denomination": 50, "quantity": 10})
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["denomination"] == 50
+    assert data["quantity"] == 10
+    assert data["id"] is not None
+
+    response = client.post("/coins", json={"denomination": 20})
+
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 0
+
+
+def test_create_duplicated_coin(session: Session, client: TestClient):
+
+    _add_coin_to_db(session, 50, 10)
+
+    response = client.post("/coins", json={"denomination": 50, "quantity": 5})
+
+    assert response.status_code == 400
+
+
+def test_create_invalid_coin(client: TestClient):
+
+    response = client.post("/coins", json={"denomination": 0})
+    assert response.status_code == 422
+
+    response = client.post("/coins", json={"denomination": 50, "quantity": -1})
+    assert response.status_code == 422
+
+    response = client.post("/coins", json={"quantity": 5})
+    assert response.status_code == 422
+
+
+def test_get_coin(session: Session, client: TestClient):
+
+    coin = _add_coin_to_db(session, 50, 10)
+
+    response = client.get(f"/coins/{coin.id}")
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["denomination"] == coin.denomination
+    assert data["quantity"] == coin.quantity
+
+
+def test_get_all_coins_sorted_by_denomination(session: Session, client: TestClient):
+
+    for denomination in [50, 10, 20]:
+        _add_coin_to_db(session, denomination, 5)
+
+    response = client.get("/coins")
+
+    assert response.status_code == 200
+    assert [c["denomination"] for c in response.json()] == [10, 20, 50]
+
+
+def test_patch_coin(session: Session, client: TestClient):
+
+    coin = _add_coin_to_db(session, 50, 10)
+
+    response = client.patch(f"/coins/{coin.id}", json={"quantity": 25})
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 25
+
+    # nothing sent, nothing changed
+    response = client.patch(f"/coins/{coin.id}", json={})
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 25
+
+    response = client.patch(f"/coins/{coin.id}", json={"quantity": None})
+    assert response.status_code == 422
+
+    response = client.patch(f"/coins/{coin.id}", json={"quantity": -1})
+    assert response.status_code == 422
+
+    session.refresh(coin)
+    assert coin.quantity == 25
+
+
+def test_delete_coin(session: Session, client: TestClient):
+
+    coin = _add_coin_to_db(session, 50, 10)
+
+    response = client.delete(f"/coins/{coin.id}")
+
+    assert response.status_code == 204
+    assert session.get(Coin, coin.id) is None
+
+
+def test_non_existing_coin(client: TestClient):
+
+    assert client.get("/coins/1").status_code == 404
+    assert client.patch("/coins/1", json={"quantity": 5}).status_code == 404
+    assert client.delete("/coins/1").status_code == 404
@@ -0,0 +1,96 @@
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.database import create_read_engine, get_db, get_read_db
+from api.main import app
+
+
+def test_read_session_rejects_writes(tmp_path):
+
+    url = f"sqlite:///{tmp_path / 'machine.db'}"
+    primary = create_engine(url)
+    with primary.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER)"))
+        conn.execute(text("INSERT INTO items VALUES (1)"))
+
+    read_engine = create_read_engine(url)
+    db = sessionmaker(bind=read_engine)()
+    try:
+        assert db.execute(text("SELECT count(*) FROM items")).scalar() == 1
+        with pytest.raises(OperationalError):
+            db.execute(text("INSERT INTO items VALUES (2)"))
+    finally:
+        db.close()
+        read_engine.dispose()
+        primary.dispose()
+
+
+def _session_dependencies(route: APIRoute) -> set:
+    calls = set()
+    pending = [route.dependant]
+    while pending:
+        dependant = pending.pop()
+        calls.add(dependant.call)
+        pending.extend(dependant.dependencies)
+    return calls & {get_db, get_read_db}
+
+
+def _api_routes(routes):
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        elif hasattr(route, "original_router"):
+            # newer FastAPI keeps included routers as a single wrapper route
+            yield from _api_routes(route.original_router.routes)
+
+
+def test_every_route_declares_the_right_session():
+
+    checked = set()
+    for route in _api_routes(app.routes):
+        if route.path == "/":
+            continue
+        expected = {get_read_db} if route.methods == {"GET"} else {get_db}
+        assert _session_dependencies(route) == expected, f"{route.methods} {route.path}"
+        checked.add((next(iter(route.methods)), route.path))
+
+    assert {("GET", "/info"), ("POST", "/buy"), ("GET", "/transactions/"), ("PATCH", "/slots/{slot_id}")} <= checked
+
+
+def test_requests_are_served_by_the_right_session(session: Session, client: TestClient):
+
+    served = []
+
+    def read_override():
+        served.append("read")
+        yield session
+
+    def write_override():
+        served.append("write")
+        yield session
+
+    app.dependency_overrides[get_read_db] = read_override
+    app.dependency_overrides[get_db] = write_override
+
+    requests = [
+        ("post", "/products", {"json": {"name": "Kinder Bueno", "price": 290}}, "write"),
+        ("get", "/products", {}, "read"),
+        ("post", "/slots", {"json": {"code": "A1", "capacity": 3, "quantity": 3, "product_id": 1}}, "write"),
+        ("patch", "/slots/1", {"json": {"quantity": 2}}, "write"),
+        ("get", "/slots/1", {}, "read"),
+        ("get", "/slots/1/history", {}, "read"),
+        ("post", "/buy", {"json": {"slot": "A1", "amount": 290}}, "write"),
+        ("get", "/transactions", {}, "read"),
+        ("get", "/info", {}, "read"),
+        ("post", "/slots", {"json": {"code": "A2", "capacity": 3}}, "write"),
+        ("delete", "/slots/2", {}, "write"),
+    ]
+    for method, path, kwargs, expected in requests:
+        served.clear()
+        response = getattr(client, method)(path, **kwargs)
+        assert response.status_code < 300, f"{method} {path}"
+        assert served == [expected], f"{method} {path}"
@@ -0,0 +1,136 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from fastapi.testclient import TestClient
+
+import api.schemas as schemas
+import api.routers.slots as slots
+from api.grid import SlotGrid, row_label
+from api.models import Slot
+from api.schemas import SlotCreate
+from .test_products import _add_product_to_db
+
+
+def test_row_labels():
+
+    assert row_label(0) == "A"
+    assert row_label(9) == "J"
+    assert row_label(25) == "Z"
+    assert row_label(26) == "AA"
+    assert row_label(27) == "AB"
+
+
+def test_multi_character_codes():
+
+    grid = SlotGrid(10, 12)
+
+    assert len(grid) == 120
+    assert grid.max_code_length == 3
+    assert list(grid)[:3] == ["A1", "A2", "A3"]
+    assert list(grid)[-1] == "J12"
+    assert "J12" in grid
+
+    for invalid in ["K1", "A0", "A13", "1A", "a1", ""]:
+        assert invalid not in grid
+
+
+def test_large_grid_codes():
+
+    grid = SlotGrid(50, 100)
+
+    assert len(grid) == 5000
+    assert len(set(grid)) == 5000
+    assert grid.max_code_length == 5
+    assert "AX100" in grid
+    assert "AY1" not in grid
+    assert "A101" not in grid
+
+
+@pytest.fixture(name="cabinet")
+def cabinet_fixture(monkeypatch):
+    """Swap the machine grid for one of the given size for the test."""
+    def use(rows: int, columns: int) -> SlotGrid:
+        grid = SlotGrid(rows, columns)
+        monkeypatch.setattr(schemas, "GRID", grid)
+        monkeypatch.setattr(slots, "GRID", grid)
+        return grid
+    return use
+
+
+def test_create_slot_with_multi_character_code(client: TestClient, cabinet):
+
+    cabinet(10, 12)
+
+    response = client.post("/slots", json={"code": "J12", "capacity": 3})
+    assert response.status_code == 200
+    assert response.json()["code"] == "J12"
+
+    response = client.post("/slots", json={"code": "J12", "capacity": 3})
+    assert response.status_code == 400
+
+    for invalid in ["K1", "A13", "J0", "12J"]:
+        response = client.post("/slots", json={"code": invalid, "capacity": 3})
+        assert response.status_code == 422
+
+
+def test_validation_on_large_grid(cabinet):
+
+    grid = cabinet(50, 100)
+
+    for code in grid:
+        assert SlotCreate(code=code, capacity=3).code == code
+
+    for invalid in ["AY1", "A101", "AX0", "a1"]:
+        with pytest.raises(ValidationError):
+            SlotCreate(code=invalid, capacity=3)
+
+
+def test_buy_on_large_grid(session: Session, client: TestClient, queries: list, cabinet, monkeypatch):
+
+    grid = cabinet(50, 100)
+    monkeypatch.setattr(slots, "_slot_ids", {})
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    session.add_all([
+        Slot(code=code, capacity=3, quantity=3, product_id=product.id)
+        for code in grid
+    ])
+    session.commit()
+
+    response = client.post("/buy", json={"slot": "AX100", "amount": 290})
+
+    assert response.status_code == 200
+    slot = session.get(Slot, response.json()["transaction"]["slot_id"])
+    assert slot.code == "AX100"
+    assert slot.quantity == 2
+
+    # codes outside the grid are refused without a query
+    queries.clear()
+    response = client.post("/buy", json={"slot": "AY1", "amount": 290})
+
+    assert response.status_code == 404
+    assert queries == []
+
+    # the first lookup of a code goes through the code column and fills the map
+    session.expunge_all()
+    queries.clear()
+    client.post("/buy", json={"slot": "B7", "amount": 290})
+
+    assert "WHERE slots.code = ?" in queries[0]
+    assert slots._slot_ids["B7"] == session.query(Slot).filter(Slot.code == "B7").one().id
+
+    # after that the slot is loaded by primary key, whatever the grid size
+    session.expunge_all()
+    queries.clear()
+    client.post("/buy", json={"slot": "B7", "amount": 290})
+
+    assert "WHERE slots.id = ?" in queries[0]
+    assert not any("WHERE slots.code = ?" in q for q in queries)
+
+
+def test_buy_slot_code_length(client: TestClient, cabinet):
+
+    cabinet(10, 12)
+
+    response = client.post("/buy", json={"slot": "J123", "amount": 290})
+
+    assert response.status_code == 422
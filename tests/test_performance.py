@@ -0,0 +1,136 @@
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+from fastapi.testclient import TestClient
+
+from api.config import INVENTORY_SNAPSHOT_INTERVAL
+from api.models import Transaction
+from .test_products import _add_product_to_db
+from .test_slots import _add_slot_to_db
+from .test_coins import _add_coin_to_db
+
+
+# SQL statements per request. A change here means an endpoint got an extra
+# round trip (or an N+1); update the number only if that is intended.
+BUY_QUERIES = 10        # slot, product, coins, ledger count, 2 updates, 2 inserts, 2 refreshes
+INFO_QUERIES = 3        # products, slots, transactions
+HISTORY_QUERIES = 3     # slot, latest snapshot, event tail
+
+# Time budgets sit about 10x above what a quiet machine measures (~20 ms per
+# sale, ~0.1 s for /info) so they only catch order-of-magnitude regressions and
+# survive parallel workers; the statement counts above are the precise guard.
+BUY_TIME_BUDGET = 0.25  # seconds per sale, averaged
+INFO_TIME_BUDGET = 1.0  # seconds for /info with a large transaction history
+
+
+def _stock_machine(session: Session, client: TestClient):
+    # through the API, so the slots already have their ledger like in a running machine
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    for code in ["A1", "A2", "A3", "A4"]:
+        client.post("/slots", json={"code": code, "capacity": 3, "quantity": 3, "product_id": product.id})
+    _add_coin_to_db(session, 10, 50)
+    _add_coin_to_db(session, 50, 20)
+    _add_coin_to_db(session, 100, 0)
+    return product
+
+
+def _request(session: Session, queries: list, send):
+    # each real request gets a fresh session, so nothing is served from the identity map
+    session.expunge_all()
+    queries.clear()
+    response = send()
+    return response, len(queries)
+
+
+def test_buy_query_count(session: Session, client: TestClient, queries: list):
+
+    _stock_machine(session, client)
+
+    for code in ["A1", "A2", "A3"]:
+        response, count = _request(session, queries, lambda: client.post("/buy", json={"slot": code, "amount": 350, "coins": [100, 100, 100, 50]}))
+        assert response.status_code == 200
+        assert count == BUY_QUERIES
+
+
+@pytest.mark.parametrize("path", ["/products", "/slots", "/transactions", "/coins", "/slots/1"])
+def test_read_endpoints_use_one_query(session: Session, client: TestClient, queries: list, path: str):
+
+    _stock_machine(session, client)
+
+    response, count = _request(session, queries, lambda: client.get(path))
+
+    assert response.status_code == 200
+    assert count == 1
+
+
+def test_info_query_count_does_not_grow(session: Session, client: TestClient, queries: list):
+
+    _stock_machine(session, client)
+
+    response, count = _request(session, queries, lambda: client.get("/info"))
+    assert response.status_code == 200
+    assert count == INFO_QUERIES
+
+    client.post("/buy", json={"slot": "A1", "amount": 290})
+    client.post("/buy", json={"slot": "A2", "amount": 290})
+
+    response, count = _request(session, queries, lambda: client.get("/info"))
+    assert response.status_code == 200
+    assert count == INFO_QUERIES
+
+
+def test_buy_time_budget(session: Session, client: TestClient):
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    _add_slot_to_db(session, "A1", 3, 0, product.id)
+    _add_coin_to_db(session, 10, 500)
+    _add_coin_to_db(session, 50, 200)
+    _add_coin_to_db(session, 100, 0)
+
+    sales = 30
+    elapsed = 0
+    for _ in range(sales):
+        client.patch("/slots/1", json={"quantity": 3})
+        start = time.perf_counter()
+        response = client.post("/buy", json={"slot": "A1", "amount": 350, "coins": [100, 100, 100, 50]})
+        elapsed += time.perf_counter() - start
+        assert response.status_code == 200
+
+    assert elapsed / sales < BUY_TIME_BUDGET
+
+
+def test_info_time_budget(session: Session, client: TestClient):
+
+    product = _stock_machine(session, client)
+    session.add_all([
+        Transaction(product_id=product.id, slot_id=1, amount=product.price, date=datetime.today())
+        for _ in range(500)
+    ])
+    session.commit()
+
+    start = time.perf_counter()
+    response = client.get("/info")
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    assert len(response.json()["transactions"]) == 500
+    assert elapsed < INFO_TIME_BUDGET
+
+
+def test_history_query_count(session: Session, client: TestClient, queries: list):
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    client.post("/slots", json={"code": "A1", "capacity": 3, "quantity": 3, "product_id": product.id})
+    for _ in range(50):
+        client.post("/buy", json={"slot": "A1", "amount": 290})
+        client.patch("/slots/1", json={"quantity": 3})
+
+    # latest snapshot plus its event tail, however long the ledger is
+    response, count = _request(session, queries, lambda: client.get("/slots/1/history"))
+
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 3
+    assert len(response.json()["events"]) < INVENTORY_SNAPSHOT_INTERVAL
+    assert count == HISTORY_QUERIES
@@ -0,0 +1,73 @@
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+import api.main as main
+import api.profiling as profiling
+from api.database import get_read_db
+
+
+@pytest.fixture(name="profiled_client")
+def profiled_client_fixture(monkeypatch, tmp_path, engine, session: Session):
+    """The real /info handler behind the profiling middleware, on the test database."""
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+
+    # make the handler slow enough to be sampled, it stays on the stack while this runs
+    list_transactions = main.list_transactions
+
+    def slow_list_transactions(db):
+        time.sleep(0.05)
+        return list_transactions(db)
+
+    monkeypatch.setattr(main, "list_transactions", slow_list_transactions)
+
+    def get_db_override():
+        yield session
+
+    app = FastAPI()
+    app.add_api_route("/info", main.get_info, methods=["GET"])
+    app.dependency_overrides[get_read_db] = get_db_override
+    profiling.install_profiler(app, engine)
+
+    yield TestClient(app)
+
+    profiling.remove_sql_hooks(engine)
+
+
+def test_request_without_header_is_not_profiled(profiled_client: TestClient, tmp_path):
+
+    response = profiled_client.get("/info")
+    assert response.status_code == 200
+
+    response = profiled_client.get("/info", headers={"X-Profile": "wrong"})
+    assert response.status_code == 200
+
+    assert "X-Profile-File" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_request_with_header_writes_profile(profiled_client: TestClient, tmp_path):
+
+    response = profiled_client.get("/info", headers={"X-Profile": "secret"})
+
+    assert response.status_code == 200
+    base = tmp_path / response.headers["X-Profile-File"]
+
+    stacks = base.with_suffix(".collapsed").read_text().splitlines()
+    assert stacks
+    assert any("get_info (main.py:" in stack for stack in stacks)
+
+    summary = json.loads(base.with_suffix(".json").read_text())
+    assert summary["path"] == "/info"
+    assert summary["status_code"] == 200
+    assert summary["samples"] > 0
+    # products, slots and transactions; the test harness adds its own SAVEPOINT
+    selects = [q for q in summary["sql"] if q["statement"].startswith("SELECT")]
+    assert len(selects) == 3
+    assert summary["sql_count"] == len(summary["sql"])
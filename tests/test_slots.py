@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
 from fastapi.testclient import TestClient
 
-from api.models import Slot
+from datetime import datetime
+
+import api.routers.slots as slots
+from api.models import Slot, InventoryEvent, InventorySnapshot
 from api.schemas import SlotCreate
 from .test_products import _add_product_to_db
 
@@ -158,3 +161,110 @@ def test_get_all_slots(session: Session, client: TestClient):
 #     product_with_missing_value = {"name": "Kinder Bueno"}
 #     response = client.post("/products", json=product_with_missing_value)
 #     assert response.status_code == 422
+
+
+def test_slot_history(session: Session, client: TestClient):
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    response = client.post("/slots", json={"code": "A1", "capacity": 3, "quantity": 3, "product_id": product.id})
+    slot_id = response.json()["id"]
+
+    client.post("/buy", json={"slot": "A1", "amount": 290})
+    client.post("/buy", json={"slot": "A1", "amount": 290})
+    before_restock = datetime.today()
+    client.patch(f"/slots/{slot_id}", json={"quantity": 3})
+
+    response = client.get(f"/slots/{slot_id}/history")
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["quantity"] == 3
+    assert [(e["kind"], e["delta"]) for e in data["events"]] == [("restock", 3), ("sale", -1), ("sale", -1), ("restock", 2)]
+    assert data["events"][1]["transaction_id"] is not None
+
+    response = client.get(f"/slots/{slot_id}/history", params={"at": before_restock.isoformat()})
+
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 1
+
+
+def test_slot_history_uses_snapshots(session: Session, client: TestClient, monkeypatch):
+
+    monkeypatch.setattr(slots, "INVENTORY_SNAPSHOT_INTERVAL", 3)
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    response = client.post("/slots", json={"code": "A1", "capacity": 3, "quantity": 3, "product_id": product.id})
+    slot_id = response.json()["id"]
+    for _ in range(3):
+        client.post("/buy", json={"slot": "A1", "amount": 290})
+
+    snapshots = session.query(InventorySnapshot).filter(InventorySnapshot.slot_id == slot_id).all()
+    assert [s.quantity for s in snapshots] == [1]
+
+    response = client.get(f"/slots/{slot_id}/history")
+
+    data = response.json()
+    assert data["quantity"] == 0
+    assert data["snapshot"]["quantity"] == 1
+    assert [(e["kind"], e["delta"]) for e in data["events"]] == [("sale", -1)]
+
+
+def test_history_of_slot_stocked_without_ledger(session: Session, client: TestClient):
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    slot = _add_slot_to_db(session, "A1", 3, 3, product.id)
+
+    response = client.get(f"/slots/{slot.id}/history")
+
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 3
+    assert response.json()["events"] == []
+
+    # the first change opens the ledger with the quantity the slot already had
+    client.post("/buy", json={"slot": "A1", "amount": 290})
+    response = client.get(f"/slots/{slot.id}/history")
+
+    data = response.json()
+    assert data["quantity"] == 2
+    assert [(e["kind"], e["delta"]) for e in data["events"]] == [("opening", 3), ("sale", -1)]
+
+
+def test_delete_slot_keeps_its_history(session: Session, client: TestClient, monkeypatch):
+
+    monkeypatch.setattr(slots, "INVENTORY_SNAPSHOT_INTERVAL", 2)
+
+    product = _add_product_to_db(session, "Kinder Bueno", 290)
+    response = client.post("/slots", json={"code": "A1", "capacity": 3, "quantity": 3, "product_id": product.id})
+    slot_id = response.json()["id"]
+    client.patch(f"/slots/{slot_id}", json={"quantity": 2})
+
+    # foreign keys are enforced in the test database
+    response = client.delete(f"/slots/{slot_id}")
+    assert response.status_code == 204
+
+    response = client.get(f"/slots/{slot_id}/history")
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["quantity"] == 0
+    assert data["snapshot"]["quantity"] == 2
+    assert [(e["kind"], e["delta"]) for e in data["events"]] == [("adjustment", -2)]
+    assert session.query(InventoryEvent).filter(InventoryEvent.slot_id == slot_id).count() == 3
+
+    # a new slot with the same code gets a new id and a ledger of its own
+    response = client.post("/slots", json={"code": "A1", "capacity": 3, "quantity": 1, "product_id": product.id})
+    new_slot_id = response.json()["id"]
+    assert new_slot_id != slot_id
+
+    response = client.get(f"/slots/{new_slot_id}/history")
+
+    data = response.json()
+    assert data["quantity"] == 1
+    assert [(e["kind"], e["delta"]) for e in data["events"]] == [("restock", 1)]
+
+
+def test_history_of_non_existing_slot(client: TestClient):
+
+    response = client.get("/slots/1/history")
+
+    assert response.status_code == 404